@@ -4,10 +4,11 @@ Advanced weather analysis app with real-time data from OpenWeatherMap API
 """
 
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
+import numpy as np
+import re
 import sys
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent))
@@ -17,6 +18,34 @@ from src.data_analysis import WeatherAnalyzer
 from src.visualizations import WeatherVisualizations
 
 
+# Input is treated as Latin script (English) when it is ASCII apart from whitespace
+_LATIN_RE = re.compile(r'[\x00-\x7f\s]*')
+
+
+class _FetchFailed(Exception):
+    """Raised by cached fetchers on a failed lookup so Streamlit does not cache the failure"""
+
+    def __init__(self, result=None):
+        super().__init__()
+        self.result = result
+
+
+# 5-day forecast card; filled with str.format once per day
+_CARD_TMPL = (
+    '<div style="flex: 1; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); '
+    'padding: 25px; border-radius: 15px; text-align: center; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">'
+    '<h3 style="color: white; margin: 0; font-size: 25px; font-weight: 600;">{day_name}</h3>'
+    '<p style="color: #e0e0e0; margin: 5px 0; font-size: 17px;">{mmdd}</p>'
+    '<div style="font-size: 70px; margin: 15px 0;">{icon}</div>'
+    '<p style="color: white; margin: 5px 0; font-size: 20px;">{most_common}</p>'
+    '<div style="margin-top: 20px;">'
+    '<p style="color: #ffccbc; margin: 5px 0; font-size: 34px; font-weight: bold;">{high:.1f}°</p>'
+    '<p style="color: #b3e5fc; margin: 5px 0; font-size: 28px;">{low:.1f}°</p>'
+    '</div>'
+    '</div>'
+)
+
+
 # Page configuration
 st.set_page_config(
     page_title="Weather Analytics - Israel",
@@ -44,8 +73,71 @@ def get_api_key():
             st.stop()
 
 
-def create_weather_map(lat: float, lon: float, city_name: str, weather_condition: str):
-    """Create interactive map with weather marker"""
+@st.cache_resource
+def get_weather_api(api_key: str) -> WeatherAPI:
+    """Create a WeatherAPI client shared across reruns and sessions"""
+    return WeatherAPI(api_key)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_coords(city: str, api_key: str) -> Dict:
+    """
+    Geocode a city name, cached for 10 minutes per city and API key
+    Raises _FetchFailed instead of returning None, so a failed lookup is retried on the next rerun
+    """
+    coords = get_weather_api(api_key)._get_coordinates(city)
+    if coords is None:
+        raise _FetchFailed()
+    return coords
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_weather(lat: float, lon: float, api_key: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Fetch current weather and forecast concurrently, cached for 10 minutes per location and API key
+    The forecast is returned in columnar form (see WeatherAPI.to_columns)
+    If either request fails, raises _FetchFailed carrying the partial result so it is not cached
+    """
+    bundle = get_weather_api(api_key).get_bundle(lat=lat, lon=lon)
+    current, forecast = bundle['current'], bundle['forecast']
+
+    forecast_columns = WeatherAPI.to_columns(forecast) if forecast and 'list' in forecast else None
+    if current is None or forecast is None:
+        raise _FetchFailed((current, forecast_columns))
+    return current, forecast_columns
+
+
+# Figures are cached as shared resources: st.cache_data would pickle them, and unpickling
+# a Plotly Figure re-runs its validation. Callers must treat cached figures as read-only.
+@st.cache_resource(max_entries=128, show_spinner=False)
+def _cached_temperature_gauge(temp: float):
+    """Build the temperature gauge, cached per temperature"""
+    return WeatherVisualizations.create_temperature_gauge(temp)
+
+
+@st.cache_resource(ttl=600, max_entries=128, show_spinner=False)
+def _cached_forecast_chart(forecast_columns: Dict):
+    """Build the forecast chart, cached per forecast for as long as the forecast itself"""
+    return WeatherVisualizations.create_forecast_chart(forecast_columns)
+
+
+@st.cache_resource(max_entries=128, show_spinner=False)
+def _cached_heat_index_chart(temp_range: np.ndarray, humidity: float):
+    """Build the heat index chart, cached per temperature range and humidity"""
+    return WeatherVisualizations.create_heat_index_chart(temp_range, humidity)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _cached_daily_forecast(forecast_columns: Dict) -> Dict:
+    """Group forecast entries by day, cached per forecast"""
+    return WeatherAnalyzer.group_forecast_by_day(forecast_columns)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_map_html(lat: float, lon: float, city_name: str, weather_condition: str) -> str:
+    """Build and render the folium map to HTML once per location, city and condition"""
+    import folium
+
     m = folium.Map(location=[lat, lon], zoom_start=10)
 
     # Add marker
@@ -56,7 +148,14 @@ def create_weather_map(lat: float, lon: float, city_name: str, weather_condition
         icon=folium.Icon(color='blue', icon='cloud')
     ).add_to(m)
 
-    return m
+    # Same wrapping streamlit_folium.folium_static does before rendering
+    return folium.Figure().add_child(m).render()
+
+
+def create_weather_map(lat: float, lon: float, city_name: str, weather_condition: str) -> str:
+    """Create interactive map with weather marker, rendered to HTML"""
+    # Round coordinates (~100 m) so repeat lookups of the same city share one rendering
+    return _cached_map_html(round(lat, 3), round(lon, 3), city_name, weather_condition)
 
 
 def main():
@@ -64,7 +163,6 @@ def main():
 
     # Get API key
     api_key = get_api_key()
-    weather_api = WeatherAPI(api_key)
 
     # Sidebar
     st.sidebar.header("⚙️ Settings")
@@ -80,7 +178,10 @@ def main():
     if selected_city:
         # Get city name in English first
         with st.spinner(f"Loading weather data for {selected_city}..."):
-            city_coords = weather_api._get_coordinates(selected_city)
+            try:
+                city_coords = _cached_coords(selected_city, api_key)
+            except _FetchFailed:
+                city_coords = None
             if not city_coords:
                 st.error("❌ City not found. Please check the city name and try again.")
                 st.stop()
@@ -88,20 +189,18 @@ def main():
             city_name_en = city_coords['name_en']
 
             # Create display name: if input is in a different language, show both
-            # Check if the input is in Latin script (English) or different script
-            def is_latin(text):
-                """Check if text uses primarily Latin characters"""
-                return all(ord(char) < 128 or char.isspace() or char in '-,.' for char in text)
-
             # Only add parentheses if the input is in a different script (not English)
-            if not is_latin(selected_city) and selected_city.lower().strip() != city_name_en.lower().strip():
+            if not _LATIN_RE.fullmatch(selected_city) and selected_city.lower().strip() != city_name_en.lower().strip():
                 city_display_name = f"{city_name_en} ({selected_city})"
             else:
                 city_display_name = city_name_en
 
             # Fetch weather data
-            current_weather = weather_api.get_current_weather(city=selected_city)
-            forecast = weather_api.get_forecast(city=selected_city)
+            try:
+                current_weather, forecast_columns = _cached_weather(city_coords['lat'], city_coords['lon'], api_key)
+            except _FetchFailed as e:
+                # Show whatever did load; the next rerun fetches again
+                current_weather, forecast_columns = e.result
 
         if not current_weather:
             st.error("❌ Error loading weather data. Check the API key or city name.")
@@ -165,28 +264,18 @@ def main():
 
             # Temperature gauge
             st.plotly_chart(
-                WeatherVisualizations.create_temperature_gauge(temp),
+                _cached_temperature_gauge(round(temp, 1)),
                 use_container_width=True
             )
 
             # Daily forecast
             st.subheader("📅 5-Day Forecast")
 
-            if forecast and 'list' in forecast:
-                from collections import defaultdict
+            if forecast_columns:
                 from datetime import datetime, timedelta
 
                 # Group forecasts by day
-                daily_data = defaultdict(lambda: {'temps': [], 'weather': [], 'date': None})
-
-                for item in forecast['list']:
-                    dt = datetime.fromtimestamp(item['dt'])
-                    day_key = dt.strftime('%Y-%m-%d')
-
-                    daily_data[day_key]['temps'].append(item['main']['temp'])
-                    daily_data[day_key]['weather'].append(item['weather'][0]['main'])
-                    if daily_data[day_key]['date'] is None:
-                        daily_data[day_key]['date'] = dt
+                daily = _cached_daily_forecast(forecast_columns)
 
                 # Weather emoji mapping
                 weather_emoji = {
@@ -195,57 +284,50 @@ def main():
                     'Haze': '🌫️', 'Dust': '🌫️', 'Fog': '🌫️', 'Sand': '🌫️'
                 }
 
-                # Create columns for each day (up to 5 days)
-                days_to_show = min(5, len(daily_data))
-                cols = st.columns(days_to_show)
+                # Build one card per day (up to 5 days)
+                days_to_show = min(5, len(daily['dates']))
+                cards = []
+                today = datetime.now().date()
+                tomorrow = today + timedelta(days=1)
 
-                for idx, day_key in enumerate(sorted(daily_data.keys())[:days_to_show]):
-                    data = daily_data[day_key]
-                    dt = data['date']
+                for idx in range(days_to_show):
+                    dt = daily['dates'][idx]
+                    dt_date = dt.date()
+                    wday = dt.strftime('%a')
+                    mmdd = dt.strftime('%m/%d')
 
                     # Determine day name
-                    if dt.date() == datetime.now().date():
-                        day_name = f'Today ({dt.strftime("%a")})'
-                    elif dt.date() == (datetime.now().date() + timedelta(days=1)):
-                        day_name = f'Tomorrow ({dt.strftime("%a")})'
+                    if dt_date == today:
+                        day_name = f'Today ({wday})'
+                    elif dt_date == tomorrow:
+                        day_name = f'Tomorrow ({wday})'
                     else:
-                        day_name = dt.strftime('%a')
+                        day_name = wday
 
-                    # Get most common weather
-                    most_common = max(set(data['weather']), key=data['weather'].count)
+                    # Most common weather
+                    most_common = daily['conditions'][idx]
                     icon = weather_emoji.get(most_common, '🌤️')
 
-                    high = max(data['temps'])
-                    low = min(data['temps'])
-
-                    # Display in column
-                    with cols[idx]:
-                        st.markdown(f"""
-                        <div style="
-                            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                            padding: 25px;
-                            border-radius: 15px;
-                            text-align: center;
-                            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                        ">
-                            <h3 style="color: white; margin: 0; font-size: 25px; font-weight: 600;">{day_name}</h3>
-                            <p style="color: #e0e0e0; margin: 5px 0; font-size: 17px;">{dt.strftime('%m/%d')}</p>
-                            <div style="font-size: 70px; margin: 15px 0;">{icon}</div>
-                            <p style="color: white; margin: 5px 0; font-size: 20px;">{most_common}</p>
-                            <div style="margin-top: 20px;">
-                                <p style="color: #ffccbc; margin: 5px 0; font-size: 34px; font-weight: bold;">{high:.1f}°</p>
-                                <p style="color: #b3e5fc; margin: 5px 0; font-size: 28px;">{low:.1f}°</p>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    high = daily['highs'][idx]
+                    low = daily['lows'][idx]
+
+                    cards.append(_CARD_TMPL.format(
+                        day_name=day_name, mmdd=mmdd, icon=icon, most_common=most_common, high=high, low=low
+                    ))
+
+                # Display all cards in a single row
+                st.markdown(
+                    '<div style="display: flex; gap: 16px;">' + ''.join(cards) + '</div>',
+                    unsafe_allow_html=True
+                )
 
         # Tab 2: Forecast and Analysis
         with tab2:
             st.header("Forecast and Trend Analysis")
 
-            if forecast:
+            if forecast_columns:
                 # Trend analysis
-                trends = WeatherAnalyzer.analyze_forecast_trends(forecast)
+                trends = WeatherAnalyzer.analyze_forecast_trends(forecast_columns)
 
                 if trends['has_data']:
                     # Display metrics
@@ -273,10 +355,7 @@ def main():
                         st.info(f"🌧️ Rain probability: {trends['rain_probability']:.0f}%")
 
                     # Forecast chart
-                    st.plotly_chart(
-                        WeatherVisualizations.create_forecast_chart(forecast),
-                        use_container_width=True
-                    )
+                    st.plotly_chart(_cached_forecast_chart(forecast_columns), use_container_width=True)
                 else:
                     st.warning("No forecast data available")
             else:
@@ -311,9 +390,9 @@ def main():
 
             with col2:
                 # Heat index chart for range of temperatures
-                temp_range = list(range(int(temp) - 5, int(temp) + 10))
+                temp_range = np.linspace(temp - 5, temp + 10, 200, dtype=np.float64)
                 st.plotly_chart(
-                    WeatherVisualizations.create_heat_index_chart(temp_range, humidity),
+                    _cached_heat_index_chart(temp_range, humidity),
                     use_container_width=True
                 )
 
@@ -321,8 +400,10 @@ def main():
         with tab4:
             st.header("🌍 Interactive Map")
 
-            weather_map = create_weather_map(lat, lon, city_name_en, description)
-            folium_static(weather_map, width=800, height=500)
+            import streamlit.components.v1 as components
+
+            map_html = create_weather_map(lat, lon, city_name_en, description)
+            components.html(map_html, width=800, height=510)
     else:
         # Show default message when no city is selected
         st.title("🌤️ Advanced Weather Analytics")
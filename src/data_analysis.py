@@ -4,43 +4,58 @@ Handles weather data trends and statistical analysis
 """
 
 import numpy as np
-from typing import Dict
+from collections import Counter
+from typing import Dict, Tuple
+
+
+def _trend_stats(temps: np.ndarray, rain_flags: np.ndarray) -> Tuple[float, float, float, float, float, float]:
+    """
+    Numeric core of analyze_forecast_trends
+
+    Args:
+        temps: Forecast temperatures
+        rain_flags: Whether each forecast point includes rain
+
+    Returns:
+        (average, minimum, maximum, first 24h average, last 24h average, rain percentage)
+    """
+    return (
+        float(temps.mean()),
+        float(temps.min()),
+        float(temps.max()),
+        float(temps[:8].mean()),  # First 24 hours
+        float(temps[-8:].mean()),  # Last 24 hours
+        np.count_nonzero(rain_flags) * 100 / rain_flags.size
+    )
 
 
 class WeatherAnalyzer:
     """Class for analyzing weather data and trends"""
 
     @staticmethod
-    def analyze_forecast_trends(forecast_data: Dict) -> Dict:
+    def analyze_forecast_trends(forecast_columns: Dict) -> Dict:
         """
         Analyze trends in forecast data
 
         Args:
-            forecast_data: Forecast data from API
+            forecast_columns: Columnar forecast data from WeatherAPI.to_columns()
 
         Returns:
             Dictionary with trend analysis
         """
-        if not forecast_data or 'list' not in forecast_data:
+        if not forecast_columns or len(forecast_columns['temp']) == 0:
             return {"has_data": False}
 
-        temps = [item['main']['temp'] for item in forecast_data['list']]
+        temps = forecast_columns['temp']
+        rain_mask = forecast_columns['has_rain']
 
         # Calculate statistics
-        avg_temp = np.mean(temps)
-        min_temp = min(temps)
-        max_temp = max(temps)
+        avg_temp, min_temp, max_temp, first_day_avg, last_day_avg, rain_probability = _trend_stats(temps, rain_mask)
 
         # Find trend (warming or cooling)
-        first_day_avg = np.mean(temps[:8])  # First 24 hours
-        last_day_avg = np.mean(temps[-8:])  # Last 24 hours
         trend = "Rising" if last_day_avg > first_day_avg else "Falling"
         trend_diff = abs(last_day_avg - first_day_avg)
 
-        # Rain probability
-        rain_forecasts = [item for item in forecast_data['list'] if 'rain' in item]
-        rain_probability = (len(rain_forecasts) / len(forecast_data['list'])) * 100
-
         return {
             "has_data": True,
             "avg_temp": round(avg_temp, 1),
@@ -53,33 +68,78 @@ class WeatherAnalyzer:
         }
 
     @staticmethod
-    def calculate_heat_index(temp_c: float, humidity: float) -> Dict:
+    def group_forecast_by_day(forecast_columns: Dict) -> Dict:
         """
-        Calculate heat index (feels like temperature)
-        Uses simplified Steadman's formula
+        Group 3-hourly forecast entries into daily summaries
 
         Args:
-            temp_c: Temperature in Celsius
+            forecast_columns: Columnar forecast data from WeatherAPI.to_columns()
+
+        Returns:
+            Dictionary with per-day dates, highs, lows and most common conditions, in date order
+        """
+        dates = forecast_columns['dates']
+        temps = forecast_columns['temp']
+        weather = forecast_columns['weather_main']
+
+        if len(dates) == 0:
+            return {"dates": [], "highs": temps[:0], "lows": temps[:0], "conditions": []}
+
+        # Entries arrive in ascending time order, so each day is one contiguous run
+        # starting at the first index of its date key
+        _, starts = np.unique(dates.astype('datetime64[D]'), return_index=True)
+        ends = np.append(starts[1:], len(temps))
+
+        return {
+            "dates": dates[starts].tolist(),
+            "highs": np.maximum.reduceat(temps, starts),
+            "lows": np.minimum.reduceat(temps, starts),
+            "conditions": [Counter(weather[start:end]).most_common(1)[0][0] for start, end in zip(starts, ends)]
+        }
+
+    @staticmethod
+    def heat_index_array(temps_c: np.ndarray, humidity: float) -> np.ndarray:
+        """
+        Calculate heat index for an array of temperatures at one humidity
+        Vectorized core of calculate_heat_index
+
+        Args:
+            temps_c: Temperatures in Celsius
             humidity: Relative humidity (0-100)
 
         Returns:
-            Dictionary with heat index info
+            Array of heat index values in Celsius
         """
         # Convert to Fahrenheit for calculation
-        temp_f = (temp_c * 9/5) + 32
+        temp_f = np.asarray(temps_c, dtype=np.float64) * 9/5 + 32
 
         # Simplified heat index formula
-        hi_f = 0.5 * (temp_f + 61.0 + ((temp_f - 68.0) * 1.2) + (humidity * 0.094))
+        simple_f = 0.5 * (temp_f + 61.0 + ((temp_f - 68.0) * 1.2) + (humidity * 0.094))
 
-        # If above threshold, use full formula
-        if hi_f >= 80:
-            hi_f = (-42.379 + 2.04901523 * temp_f + 10.14333127 * humidity
-                    - 0.22475541 * temp_f * humidity - 0.00683783 * temp_f**2
-                    - 0.05481717 * humidity**2 + 0.00122874 * temp_f**2 * humidity
-                    + 0.00085282 * temp_f * humidity**2 - 0.00000199 * temp_f**2 * humidity**2)
+        # Full formula, used wherever the simplified result is above threshold
+        full_f = (-42.379 + 2.04901523 * temp_f + 10.14333127 * humidity
+                  - 0.22475541 * temp_f * humidity - 0.00683783 * temp_f**2
+                  - 0.05481717 * humidity**2 + 0.00122874 * temp_f**2 * humidity
+                  + 0.00085282 * temp_f * humidity**2 - 0.00000199 * temp_f**2 * humidity**2)
+        hi_f = np.where(simple_f >= 80, full_f, simple_f)
 
         # Convert back to Celsius
-        hi_c = (hi_f - 32) * 5/9
+        return (hi_f - 32) * 5/9
+
+    @staticmethod
+    def calculate_heat_index(temp_c: float, humidity: float) -> Dict:
+        """
+        Calculate heat index (feels like temperature)
+        Uses simplified Steadman's formula
+
+        Args:
+            temp_c: Temperature in Celsius
+            humidity: Relative humidity (0-100)
+
+        Returns:
+            Dictionary with heat index info
+        """
+        hi_c = float(WeatherAnalyzer.heat_index_array(np.array([temp_c], dtype=np.float64), humidity)[0])
 
         difference = hi_c - temp_c
 
@@ -3,10 +3,83 @@ Visualization Module
 Creates interactive charts and graphs using Plotly
 """
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime
-from typing import Dict, List
+import numpy as np
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict
+
+# Plotly is imported inside the functions that draw, so importing src (WeatherAPI, the
+# analyzer, the tests) does not load it. The Streamlit app still loads it on the first
+# run: st.tabs executes every tab body, and Tab 1 draws the gauge immediately.
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+# Forecast chart layout and styled (empty) traces, built once per process
+_FORECAST_TEMPLATE = None
+
+
+def _get_forecast_template() -> "go.Figure":
+    """Return the shared forecast chart template, building it on first use"""
+    global _FORECAST_TEMPLATE
+
+    if _FORECAST_TEMPLATE is None:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        fig = make_subplots(
+            rows=2, cols=1,
+            row_heights=[0.7, 0.3],
+            subplot_titles=('Temperature Forecast', 'Relative Humidity (%)'),
+            vertical_spacing=0.15
+        )
+
+        # Temperature traces
+        fig.add_trace(
+            go.Scatter(
+                x=[], y=[],
+                name='Temperature',
+                line=dict(color=WeatherVisualizations.COLORS['primary'], width=3),
+                mode='lines+markers'
+            ),
+            row=1, col=1
+        )
+
+        fig.add_trace(
+            go.Scatter(
+                x=[], y=[],
+                name='Feels Like',
+                line=dict(color=WeatherVisualizations.COLORS['secondary'], width=2, dash='dot'),
+                mode='lines'
+            ),
+            row=1, col=1
+        )
+
+        # Humidity trace
+        fig.add_trace(
+            go.Scatter(
+                x=[], y=[],
+                name='Humidity',
+                fill='tozeroy',
+                line=dict(color=WeatherVisualizations.COLORS['info'], width=2),
+                mode='lines'
+            ),
+            row=2, col=1
+        )
+
+        fig.update_xaxes(title_text="Date and Time", row=2, col=1)
+        fig.update_yaxes(title_text="Temperature (°C)", row=1, col=1)
+        fig.update_yaxes(title_text="Humidity (%)", row=2, col=1)
+
+        fig.update_layout(
+            height=600,
+            hovermode='x unified',
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=50, r=50, t=80, b=50)
+        )
+
+        _FORECAST_TEMPLATE = fig
+
+    return _FORECAST_TEMPLATE
 
 
 class WeatherVisualizations:
@@ -23,7 +96,7 @@ class WeatherVisualizations:
     }
 
     @staticmethod
-    def create_temperature_gauge(current_temp: float, min_temp: float = -10, max_temp: float = 45) -> go.Figure:
+    def create_temperature_gauge(current_temp: float, min_temp: float = -10, max_temp: float = 45) -> "go.Figure":
         """
         Create a temperature gauge chart
 
@@ -35,6 +108,8 @@ class WeatherVisualizations:
         Returns:
             Plotly figure
         """
+        import plotly.graph_objects as go
+
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
             value=current_temp,
@@ -69,107 +144,58 @@ class WeatherVisualizations:
         return fig
 
     @staticmethod
-    def create_forecast_chart(forecast_data: Dict) -> go.Figure:
+    def create_forecast_chart(forecast_columns: Dict) -> "go.Figure":
         """
         Create forecast temperature chart
 
         Args:
-            forecast_data: Forecast data from API
+            forecast_columns: Columnar forecast data from WeatherAPI.to_columns()
 
         Returns:
             Plotly figure
         """
-        if not forecast_data or 'list' not in forecast_data:
+        import plotly.graph_objects as go
+
+        if not forecast_columns:
             return go.Figure()
 
         # Extract data
-        dates = [datetime.fromtimestamp(item['dt']) for item in forecast_data['list']]
-        temps = [item['main']['temp'] for item in forecast_data['list']]
-        feels_like = [item['main']['feels_like'] for item in forecast_data['list']]
-        humidity = [item['main']['humidity'] for item in forecast_data['list']]
-
-        # Create figure with secondary y-axis
-        fig = make_subplots(
-            rows=2, cols=1,
-            row_heights=[0.7, 0.3],
-            subplot_titles=('Temperature Forecast', 'Relative Humidity (%)'),
-            vertical_spacing=0.15
-        )
+        dates = forecast_columns['dates']
+        temps = forecast_columns['temp']
+        feels_like = forecast_columns['feels_like']
+        humidity = forecast_columns['humidity']
 
-        # Temperature traces
-        fig.add_trace(
-            go.Scatter(
-                x=dates, y=temps,
-                name='Temperature',
-                line=dict(color=WeatherVisualizations.COLORS['primary'], width=3),
-                mode='lines+markers'
-            ),
-            row=1, col=1
-        )
+        # Copy the template so the shared figure is never mutated
+        fig = go.Figure(_get_forecast_template())
 
-        fig.add_trace(
-            go.Scatter(
-                x=dates, y=feels_like,
-                name='Feels Like',
-                line=dict(color=WeatherVisualizations.COLORS['secondary'], width=2, dash='dot'),
-                mode='lines'
-            ),
-            row=1, col=1
-        )
-
-        # Humidity trace
-        fig.add_trace(
-            go.Scatter(
-                x=dates, y=humidity,
-                name='Humidity',
-                fill='tozeroy',
-                line=dict(color=WeatherVisualizations.COLORS['info'], width=2),
-                mode='lines'
-            ),
-            row=2, col=1
-        )
-
-        fig.update_xaxes(title_text="Date and Time", row=2, col=1)
-        fig.update_yaxes(title_text="Temperature (°C)", row=1, col=1)
-        fig.update_yaxes(title_text="Humidity (%)", row=2, col=1)
-
-        fig.update_layout(
-            height=600,
-            hovermode='x unified',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            margin=dict(l=50, r=50, t=80, b=50)
-        )
+        with fig.batch_update():
+            fig.data[0].x, fig.data[0].y = dates, temps
+            fig.data[1].x, fig.data[1].y = dates, feels_like
+            fig.data[2].x, fig.data[2].y = dates, humidity
 
         return fig
 
     @staticmethod
-    def create_daily_forecast_chart(forecast_data: Dict) -> go.Figure:
+    def create_daily_forecast_chart(forecast_columns: Dict) -> "go.Figure":
         """
         Create daily forecast chart with highs/lows and weather icons
         Similar to iPhone weather app
 
         Args:
-            forecast_data: Forecast data from API
+            forecast_columns: Columnar forecast data from WeatherAPI.to_columns()
 
         Returns:
             Plotly figure with daily highs/lows
         """
-        if not forecast_data or 'list' not in forecast_data:
+        import plotly.graph_objects as go
+
+        if not forecast_columns:
             return go.Figure()
 
-        from collections import defaultdict
+        from src.data_analysis import WeatherAnalyzer
 
         # Group forecasts by day
-        daily_data = defaultdict(lambda: {'temps': [], 'weather': [], 'date': None})
-
-        for item in forecast_data['list']:
-            dt = datetime.fromtimestamp(item['dt'])
-            day_key = dt.strftime('%Y-%m-%d')
-
-            daily_data[day_key]['temps'].append(item['main']['temp'])
-            daily_data[day_key]['weather'].append(item['weather'][0]['main'])
-            if daily_data[day_key]['date'] is None:
-                daily_data[day_key]['date'] = dt
+        daily = WeatherAnalyzer.group_forecast_by_day(forecast_columns)
 
         # Process daily data
         days = []
@@ -197,26 +223,28 @@ class WeatherVisualizations:
             'Tornado': '🌪️'
         }
 
-        for day_key in sorted(daily_data.keys())[:5]:  # Get up to 5 days
-            data = daily_data[day_key]
-            dt = data['date']
+        today = datetime.now().date()
+        tomorrow = today + timedelta(days=1)
+
+        for idx, dt in enumerate(daily['dates'][:5]):  # Get up to 5 days
+            dt_date = dt.date()
 
             # Determine day name
-            if dt.date() == datetime.now().date():
+            if dt_date == today:
                 day_name = 'Today'
-            elif dt.date() == (datetime.now().date() + __import__('datetime').timedelta(days=1)):
+            elif dt_date == tomorrow:
                 day_name = 'Tomorrow'
             else:
                 day_name = dt.strftime('%a')  # Mon, Tue, etc.
 
-            # Get most common weather condition
-            most_common = max(set(data['weather']), key=data['weather'].count)
+            # Most common weather condition
+            most_common = daily['conditions'][idx]
             icon = weather_emoji.get(most_common, '🌤️')
 
             days.append(dt.strftime('%m/%d'))
             day_names.append(day_name)
-            highs.append(max(data['temps']))
-            lows.append(min(data['temps']))
+            highs.append(daily['highs'][idx])
+            lows.append(daily['lows'][idx])
             weather_icons.append(f"{icon}")
 
         # Create figure
@@ -269,7 +297,7 @@ class WeatherVisualizations:
         return fig
 
     @staticmethod
-    def create_weather_metrics_chart(weather_data: Dict) -> go.Figure:
+    def create_weather_metrics_chart(weather_data: Dict) -> "go.Figure":
         """
         Create comprehensive weather metrics chart
 
@@ -279,6 +307,8 @@ class WeatherVisualizations:
         Returns:
             Plotly figure
         """
+        import plotly.graph_objects as go
+
         if not weather_data or 'main' not in weather_data:
             return go.Figure()
 
@@ -315,25 +345,22 @@ class WeatherVisualizations:
         return fig
 
     @staticmethod
-    def create_heat_index_chart(temp_range: List[float], humidity: float) -> go.Figure:
+    def create_heat_index_chart(temp_range: np.ndarray, humidity: float) -> "go.Figure":
         """
         Create heat index comparison chart
 
         Args:
-            temp_range: Range of temperatures
+            temp_range: Range of temperatures (float64 array)
             humidity: Humidity percentage
 
         Returns:
             Plotly figure
         """
+        import plotly.graph_objects as go
         from src.data_analysis import WeatherAnalyzer
 
         temps = temp_range
-        heat_indices = []
-
-        for temp in temps:
-            hi = WeatherAnalyzer.calculate_heat_index(temp, humidity)
-            heat_indices.append(hi['heat_index'])
+        heat_indices = np.round(WeatherAnalyzer.heat_index_array(temps, humidity), 1)
 
         fig = go.Figure()
 
@@ -350,7 +377,7 @@ class WeatherVisualizations:
             y=heat_indices,
             name='Feels Like (Heat Index)',
             line=dict(color=WeatherVisualizations.COLORS['danger'], width=3),
-            mode='lines+markers',
+            mode='lines',
             fill='tonexty',
             fillcolor='rgba(214, 39, 40, 0.1)'
         ))
@@ -3,8 +3,33 @@ Weather API Integration Module
 Handles all interactions with OpenWeatherMap API
 """
 
+import copy
+import json
+import logging
+import numpy as np
+import random
 import requests
-from typing import Dict, Optional
+import shelve
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Tuple
+
+try:
+    # Optional faster decoder for the multi-kilobyte forecast payloads
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Serializes shelf access across all clients in the process; each access opens and closes
+# the file, so writes from other clients and processes are never overwritten by a stale index
+_GEO_SHELF_LOCK = threading.Lock()
 
 
 class WeatherAPI:
@@ -12,11 +37,91 @@ class WeatherAPI:
 
     BASE_URL = "https://api.openweathermap.org/data/2.5"
     GEO_URL = "https://api.openweathermap.org/geo/1.0"
+    WEATHER_URL = f"{BASE_URL}/weather"
+    FORECAST_URL = f"{BASE_URL}/forecast"
+    DIRECT_GEO_URL = f"{GEO_URL}/direct"
+
+    # City coordinates are effectively static, so geocoding results are kept for a day
+    GEO_CACHE_TTL = 24 * 60 * 60
+    GEO_CACHE_SIZE = 512
+
+    # Geocoding results also persist on disk across restarts; bump the version to invalidate them
+    GEO_DISK_CACHE_PATH = Path.home() / ".cache" / "weatherApp" / "geocode"
+    GEO_DISK_CACHE_VERSION = "v2"
+    GEO_DISK_CACHE_TTL = 30 * 24 * 60 * 60
+
+    # Observations update roughly every 10 minutes and forecasts less often
+    CURRENT_CACHE_TTL = 5 * 60
+    FORECAST_CACHE_TTL = 30 * 60
+    RESPONSE_CACHE_SIZE = 256
+
+    # Transient failures (network errors, 429, 5xx) are retried with jittered exponential backoff
+    MAX_RETRIES = 3
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    RETRY_AFTER_MAX = 60.0
+    RETRYABLE_EXCEPTIONS = (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError
+    )
 
-    def __init__(self, api_key: str):
-        """Initialize with API key"""
+    def __init__(self, api_key: str, geo_cache_path: Optional[Path] = GEO_DISK_CACHE_PATH,
+                 connect_timeout: float = 3.05, read_timeout: float = 10):
+        """
+        Initialize with API key, a pooled HTTP session and a worker pool for concurrent calls
+
+        Args:
+            api_key: OpenWeatherMap API key
+            geo_cache_path: Shelve file for persisted geocoding results, or None to keep them in memory only
+            connect_timeout: Seconds to wait for a connection (just over the 3 s TCP retransmit window)
+            read_timeout: Seconds to wait for the server between bytes of a response
+        """
         self.api_key = api_key
 
+        # Bounds every request; a timeout is retried like any other transient failure
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Query parameters shared by every weather/forecast request
+        self._base_params = {'appid': api_key, 'units': 'metric', 'lang': 'en'}
+
+        # Keep-alive connections to the API host are reused across requests
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+        # Normalized city name -> (monotonic insert time, coordinates)
+        self._geo_cache: Dict[str, Tuple[float, Dict]] = {}
+
+        # Request key -> {'done': Event, 'result': ...} for requests currently in flight
+        self._inflight: Dict[Tuple, Dict] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Shelve file for persisted geocoding results, or None for memory only
+        self._geo_cache_path = geo_cache_path
+
+        # Rounded (lat, lon[, days]) -> (monotonic insert time, response)
+        self._current_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+        self._forecast_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+
+        # The caches are shared by worker threads and Streamlit sessions; eviction iterates the dict
+        self._cache_lock = threading.Lock()
+
+        # Threads that overlap independent requests (started on first submit)
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-api")
+
+    def close(self):
+        """Close the HTTP session, its pooled connections and the worker pool"""
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def __enter__(self):
+        """Use the client as a context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the session when leaving the context"""
+        self.close()
+
     def get_current_weather(self, city: str = None, lat: float = None, lon: float = None) -> Optional[Dict]:
         """
         Get current weather data for a location
@@ -27,33 +132,16 @@ class WeatherAPI:
             lon: Longitude
 
         Returns:
-            Dictionary with weather data or None if error
+            Dictionary with weather data (a copy the caller may modify) or None if error
         """
-        try:
-            # If city is provided, get coordinates
-            if city:
-                coords = self._get_coordinates(city)
-                if not coords:
-                    return None
-                lat, lon = coords['lat'], coords['lon']
-
-            # Make API request
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric',
-                'lang': 'en'
-            }
-
-            response = requests.get(f"{self.BASE_URL}/weather", params=params)
-            response.raise_for_status()
-
-            return response.json()
+        # If city is provided, get coordinates
+        if city:
+            coords = self._get_coordinates(city)
+            if not coords:
+                return None
+            lat, lon = coords['lat'], coords['lon']
 
-        except requests.RequestException as e:
-            print(f"Error fetching weather data: {e}")
-            return None
+        return copy.deepcopy(self._current_by_coords(lat, lon))
 
     def get_forecast(self, city: str = None, lat: float = None, lon: float = None, days: int = 5) -> Optional[Dict]:
         """
@@ -66,36 +154,164 @@ class WeatherAPI:
             days: Number of days (max 5 for free tier)
 
         Returns:
-            Dictionary with forecast data
+            Dictionary with forecast data (a copy the caller may modify)
+        """
+        if city:
+            coords = self._get_coordinates(city)
+            if not coords:
+                return None
+            lat, lon = coords['lat'], coords['lon']
+
+        return copy.deepcopy(self._forecast_by_coords(lat, lon, days))
+
+    def get_bundle(self, city: str = None, lat: float = None, lon: float = None, days: int = 5) -> Dict:
+        """
+        Get current weather and forecast for a location, geocoding the city at most once
+
+        Args:
+            city: City name
+            lat: Latitude
+            lon: Longitude
+            days: Number of forecast days
+
+        Returns:
+            Dictionary with 'current' and 'forecast' entries, each None if its request failed;
+            the entries are copies the caller may modify
+        """
+        if city:
+            coords = self._get_coordinates(city)
+            if not coords:
+                return {'current': None, 'forecast': None}
+            lat, lon = coords['lat'], coords['lon']
+
+        # Both requests only need the coordinates, so their round-trips can overlap
+        current = self._executor.submit(self._current_by_coords, lat, lon)
+        forecast = self._executor.submit(self._forecast_by_coords, lat, lon, days)
+        return {'current': copy.deepcopy(current.result()), 'forecast': copy.deepcopy(forecast.result())}
+
+    def _current_by_coords(self, lat: float, lon: float) -> Optional[Dict]:
+        """
+        Get current weather data for coordinates
+        Successful responses are cached per location (~100 m) for CURRENT_CACHE_TTL seconds;
+        the returned dict is the cached object itself and must not be modified
+        """
+        key = (round(lat, 3), round(lon, 3))
+        cached = self._cache_get(self._current_cache, key, self.CURRENT_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+        return self._single_flight(('weather',) + key, self._fetch_current, lat, lon, key)
+
+    def _fetch_current(self, lat: float, lon: float, key: Tuple) -> Optional[Dict]:
+        """
+        Request current weather data and cache it under key
         """
         try:
-            if city:
-                coords = self._get_coordinates(city)
-                if not coords:
-                    return None
-                lat, lon = coords['lat'], coords['lon']
+            params = {**self._base_params, 'lat': lat, 'lon': lon}
 
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric',
-                'lang': 'en',
-                'cnt': days * 8  # 8 forecasts per day (every 3 hours)
-            }
+            response = self._request_with_retry(self.WEATHER_URL, params)
+
+            data = _json_loads(response.content)
+            self._cache_put(self._current_cache, key, data, self.RESPONSE_CACHE_SIZE)
+            return data
+
+        except requests.RequestException:
+            # Already logged by _request_with_retry
+            return None
+        except ValueError as e:
+            logger.warning("Error decoding weather data: %s", e)
+            return None
+
+    def _forecast_by_coords(self, lat: float, lon: float, days: int = 5) -> Optional[Dict]:
+        """
+        Get weather forecast for coordinates
+        Successful responses are cached per location and length for FORECAST_CACHE_TTL seconds;
+        the returned dict is the cached object itself and must not be modified
+        """
+        key = (round(lat, 3), round(lon, 3), days)
+        cached = self._cache_get(self._forecast_cache, key, self.FORECAST_CACHE_TTL)
+        if cached is not None:
+            return cached
 
-            response = requests.get(f"{self.BASE_URL}/forecast", params=params)
-            response.raise_for_status()
+        return self._single_flight(('forecast',) + key, self._fetch_forecast, lat, lon, days, key)
 
-            return response.json()
+    def _fetch_forecast(self, lat: float, lon: float, days: int, key: Tuple) -> Optional[Dict]:
+        """
+        Request a weather forecast and cache it under key
+        """
+        try:
+            # 8 forecasts per day (every 3 hours)
+            params = {**self._base_params, 'lat': lat, 'lon': lon, 'cnt': days * 8}
 
-        except requests.RequestException as e:
-            print(f"Error fetching forecast: {e}")
+            response = self._request_with_retry(self.FORECAST_URL, params)
+
+            data = _json_loads(response.content)
+            self._cache_put(self._forecast_cache, key, data, self.RESPONSE_CACHE_SIZE)
+            return data
+
+        except requests.RequestException:
+            # Already logged by _request_with_retry
+            return None
+        except ValueError as e:
+            logger.warning("Error decoding forecast: %s", e)
             return None
 
+    @staticmethod
+    def to_columns(forecast: Dict) -> Dict:
+        """
+        Convert a forecast response into columnar arrays
+
+        Args:
+            forecast: Forecast data from get_forecast()
+
+        Returns:
+            Dictionary of per-field columns, one entry per forecast point
+        """
+        items = forecast['list']
+        n = len(items)
+        dt = np.fromiter((item['dt'] for item in items), dtype=np.int64, count=n)
+
+        # Naive local times (as datetime.fromtimestamp gives): shift by the local UTC offset,
+        # looked up per timestamp only when a DST change falls inside the forecast window
+        offsets = [time.localtime(int(t)).tm_gmtoff for t in (dt[0], dt[-1])] if n else [0, 0]
+        if offsets[0] == offsets[1]:
+            local = dt + offsets[0]
+        else:
+            local = dt + np.fromiter((time.localtime(int(t)).tm_gmtoff for t in dt), dtype=np.int64, count=n)
+
+        return {
+            'dt': dt,
+            'dates': local.astype('datetime64[s]'),
+            'temp': np.fromiter((item['main']['temp'] for item in items), dtype=np.float64, count=n),
+            'feels_like': np.fromiter((item['main']['feels_like'] for item in items), dtype=np.float64, count=n),
+            'humidity': np.fromiter((item['main']['humidity'] for item in items), dtype=np.float64, count=n),
+            'weather_main': [item['weather'][0]['main'] for item in items],
+            'has_rain': np.fromiter(('rain' in item for item in items), dtype=bool, count=n)
+        }
+
     def _get_coordinates(self, city: str) -> Optional[Dict]:
         """
         Get coordinates for a city name using geocoding API
+        Successful lookups are cached per normalized city name for GEO_CACHE_TTL seconds
+        in memory, and for GEO_DISK_CACHE_TTL seconds in the disk cache when one is configured
+        Returns a copy, so callers may modify the result without touching the cache
+        """
+        key = city.strip().lower()
+        coords = self._cache_get(self._geo_cache, key, self.GEO_CACHE_TTL)
+
+        if coords is None:
+            coords = self._disk_geo_get(key)
+            if coords is not None:
+                self._cache_put(self._geo_cache, key, coords, self.GEO_CACHE_SIZE)
+
+        if coords is None:
+            coords = self._single_flight(('geo', key), self._fetch_coordinates, city, key)
+
+        return dict(coords) if coords is not None else None
+
+    def _fetch_coordinates(self, city: str, key: str) -> Optional[Dict]:
+        """
+        Request coordinates for a city name and cache them under key
         """
         try:
             params = {
@@ -104,19 +320,177 @@ class WeatherAPI:
                 'appid': self.api_key
             }
 
-            response = requests.get(f"{self.GEO_URL}/direct", params=params)
-            response.raise_for_status()
+            response = self._request_with_retry(self.DIRECT_GEO_URL, params)
 
-            data = response.json()
+            data = _json_loads(response.content)
             if data:
-                return {
+                coords = {
                     'lat': data[0]['lat'],
                     'lon': data[0]['lon'],
                     'name_en': data[0]['name']
                 }
+                self._cache_put(self._geo_cache, key, coords, self.GEO_CACHE_SIZE)
+                self._disk_geo_put(key, coords)
+                return coords
+
+            return None
+
+        except requests.RequestException:
+            # Already logged by _request_with_retry
+            return None
+        except ValueError as e:
+            logger.warning("Error decoding geocoding response: %s", e)
+            return None
+
+    def _single_flight(self, key: Tuple, fetch, *args) -> Optional[Dict]:
+        """
+        Call fetch(*args) unless an identical request is already in flight,
+        in which case wait for it and share its result
+        Every caller receives the same object, so results must be treated as read-only
+        """
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = {'done': threading.Event(), 'result': None}
 
+        if not leader:
+            call['done'].wait()
+            return call['result']
+
+        try:
+            call['result'] = fetch(*args)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call['done'].set()
+        return call['result']
+
+    def _disk_geo_get(self, key: str) -> Optional[Dict]:
+        """Read persisted coordinates for a normalized city name, or None if absent or expired"""
+        if self._geo_cache_path is None:
             return None
 
-        except requests.RequestException as e:
-            print(f"Error geocoding city: {e}")
+        with _GEO_SHELF_LOCK:
+            try:
+                with shelve.open(str(self._geo_cache_path), flag='r') as shelf:
+                    entry = shelf.get(f"{self.GEO_DISK_CACHE_VERSION}:{key}")
+            except Exception as e:
+                # Missing, locked by another process, or corrupt: treat as a miss
+                logger.debug("Geocoding disk cache read failed: %s", e)
+                return None
+
+        if entry and time.time() - entry[0] < self.GEO_DISK_CACHE_TTL:
+            return entry[1]
+        return None
+
+    def _disk_geo_put(self, key: str, coords: Dict):
+        """Persist coordinates for a normalized city name with their wall-clock insert time"""
+        if self._geo_cache_path is None:
+            return
+
+        with _GEO_SHELF_LOCK:
+            try:
+                Path(self._geo_cache_path).parent.mkdir(parents=True, exist_ok=True)
+                with shelve.open(str(self._geo_cache_path)) as shelf:
+                    shelf[f"{self.GEO_DISK_CACHE_VERSION}:{key}"] = (time.time(), coords)
+            except Exception as e:
+                logger.warning("Geocoding disk cache write failed: %s", e)
+
+    def _request_with_retry(self, url: str, params: Dict) -> requests.Response:
+        """
+        GET a URL, retrying transient failures with exponential backoff and jitter
+
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+
+        Returns:
+            Successful response
+
+        Raises:
+            requests.RequestException: On a non-retryable error or once retries are exhausted;
+                the failure is logged here as a single WARNING, so callers do not log it again
+        """
+        rate_limited = 0
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = self._session.get(url, params=params, timeout=self.timeout)
+            except self.RETRYABLE_EXCEPTIONS as e:
+                if attempt == self.MAX_RETRIES:
+                    logger.warning("Request to %s failed after %d attempts (%d rate limited): %s",
+                                   url, attempt + 1, rate_limited, e)
+                    raise
+                logger.debug("Request to %s failed (%s), retrying", url, e)
+            except requests.RequestException as e:
+                logger.warning("Request to %s failed: %s", url, e)
+                raise
+            else:
+                # Other 4xx errors will not succeed on retry, so they raise immediately
+                if response.status_code != 429 and response.status_code < 500:
+                    if response.status_code >= 400:
+                        logger.warning("Request to %s failed: HTTP %d", url, response.status_code)
+                    response.raise_for_status()
+                    return response
+
+                if response.status_code == 429:
+                    rate_limited += 1
+                if attempt == self.MAX_RETRIES:
+                    logger.warning("Request to %s failed after %d attempts (%d rate limited): HTTP %d",
+                                   url, attempt + 1, rate_limited, response.status_code)
+                    response.raise_for_status()
+
+                if response.status_code == 429:
+                    # Rate limited: wait as long as the server asks, when it says
+                    retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        logger.debug("Rate limited by %s, retrying after %.1fs", url, retry_after)
+                        time.sleep(retry_after)
+                        continue
+                    logger.debug("Rate limited by %s, retrying", url)
+                else:
+                    logger.debug("Request to %s returned %d, retrying", url, response.status_code)
+
+            delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt)
+            time.sleep(delay * (1 + random.uniform(0, 0.5)))
+
+    @classmethod
+    def _parse_retry_after(cls, value: Optional[str]) -> Optional[float]:
+        """
+        Parse a Retry-After header given as delay seconds or an HTTP-date
+
+        Returns:
+            Seconds to wait, capped at RETRY_AFTER_MAX, or None if absent or unparseable
+        """
+        if not value:
             return None
+
+        value = value.strip()
+        if value.isdigit():
+            seconds = float(value)
+        else:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+        return min(max(seconds, 0.0), cls.RETRY_AFTER_MAX)
+
+    def _cache_get(self, cache: Dict, key, ttl: float) -> Optional[Dict]:
+        """Return a cached value younger than ttl seconds, or None"""
+        with self._cache_lock:
+            entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        return None
+
+    def _cache_put(self, cache: Dict, key, value: Dict, max_size: int):
+        """Store a value with its insert time, evicting the oldest entry when the cache is full"""
+        with self._cache_lock:
+            cache.pop(key, None)
+            if len(cache) >= max_size:
+                cache.pop(next(iter(cache)), None)
+            cache[key] = (time.monotonic(), value)
@@ -0,0 +1,38 @@
+"""
+Shared fixtures for the WeatherAPI tests
+HTTP is stubbed by patching the client's session; backoff sleeps are patched out
+"""
+
+from unittest import mock
+
+import pytest
+
+from src import weather_api
+from src.weather_api import WeatherAPI
+
+
+@pytest.fixture
+def make_response():
+    """Factory for stub requests.Response objects"""
+    def factory(status_code=200, content=b'{}', headers=None):
+        response = mock.Mock(status_code=status_code, content=content, headers=headers or {})
+        if status_code >= 400:
+            http_error = weather_api.requests.HTTPError(f"{status_code} Error", response=response)
+            response.raise_for_status.side_effect = http_error
+        return response
+    return factory
+
+
+@pytest.fixture
+def api():
+    """Client without a disk cache"""
+    client = WeatherAPI("test-key", geo_cache_path=None)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def sleep():
+    """Patched-out time.sleep, so retries and backoff run instantly"""
+    with mock.patch.object(weather_api.time, "sleep") as patched:
+        yield patched
@@ -0,0 +1,75 @@
+"""
+Tests for local forecast timestamps across DST changes
+to_columns and group_forecast_by_day must agree with datetime.fromtimestamp
+"""
+
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.data_analysis import WeatherAnalyzer
+from src.weather_api import WeatherAPI
+
+
+# Zone and a UTC timestamp two days before one of its DST changes (UTC has none)
+DST_WINDOWS = [
+    ("UTC", 1730419200),                  # 2024-11-01
+    ("Asia/Jerusalem", 1729814400),       # 2024-10-25, ends 2024-10-27
+    ("America/New_York", 1730419200),     # 2024-11-01, ends 2024-11-03
+    ("Australia/Lord_Howe", 1728000000)   # 2024-10-04, 30 min shift on 2024-10-06
+]
+
+
+@pytest.fixture
+def local_zone(request):
+    """Switch the process time zone for one test"""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = request.param
+    time.tzset()
+    yield request.param
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def make_forecast(start: int, count: int = 40) -> dict:
+    """Forecast response with 3-hourly entries whose temperature is the entry index"""
+    return {'list': [
+        {'dt': start + i * 3 * 3600, 'main': {'temp': float(i), 'feels_like': float(i), 'humidity': 50},
+         'weather': [{'main': 'Clear'}]}
+        for i in range(count)
+    ]}
+
+
+@pytest.mark.parametrize("local_zone, start", DST_WINDOWS, indirect=["local_zone"])
+def test_dates_match_fromtimestamp(local_zone, start):
+    forecast = make_forecast(start)
+    columns = WeatherAPI.to_columns(forecast)
+
+    expected = [datetime.fromtimestamp(item['dt']) for item in forecast['list']]
+    assert columns['dates'].astype(datetime).tolist() == expected
+
+
+@pytest.mark.parametrize("local_zone, start", DST_WINDOWS, indirect=["local_zone"])
+def test_daily_groups_match_fromtimestamp(local_zone, start):
+    forecast = make_forecast(start)
+    daily = WeatherAnalyzer.group_forecast_by_day(WeatherAPI.to_columns(forecast))
+
+    expected = {}
+    for item in forecast['list']:
+        local = datetime.fromtimestamp(item['dt'])
+        expected.setdefault(local.date(), []).append((local, item['main']['temp']))
+
+    assert daily['dates'] == [entries[0][0] for entries in expected.values()]
+    np.testing.assert_array_equal(daily['highs'], [max(t for _, t in entries) for entries in expected.values()])
+    np.testing.assert_array_equal(daily['lows'], [min(t for _, t in entries) for entries in expected.values()])
+
+
+def test_empty_forecast():
+    columns = WeatherAPI.to_columns({'list': []})
+    assert len(columns['dates']) == 0
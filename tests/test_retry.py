@@ -0,0 +1,105 @@
+"""
+Tests for WeatherAPI request retries, Retry-After handling and their logging
+"""
+
+from unittest import mock
+
+import pytest
+
+from src import weather_api
+from src.weather_api import WeatherAPI
+
+
+def test_retry_recovers_after_transient_failures(api, sleep, make_response):
+    responses = [
+        weather_api.requests.ConnectionError("connection reset"),
+        make_response(503),
+        make_response(200, b'{"name": "Paris"}')
+    ]
+    with mock.patch.object(api._session, "get", side_effect=responses) as get:
+        assert api.get_current_weather(lat=48.85, lon=2.35) == {"name": "Paris"}
+
+    assert get.call_count == 3
+    # Jittered exponential backoff: base * 2**attempt scaled by 1.0-1.5
+    delays = [c.args[0] for c in sleep.call_args_list]
+    assert len(delays) == 2
+    assert WeatherAPI.RETRY_BASE_DELAY <= delays[0] <= 1.5 * WeatherAPI.RETRY_BASE_DELAY
+    assert 2 * WeatherAPI.RETRY_BASE_DELAY <= delays[1] <= 3 * WeatherAPI.RETRY_BASE_DELAY
+
+
+def test_client_error_is_not_retried(api, sleep, make_response):
+    with mock.patch.object(api._session, "get", return_value=make_response(401)) as get:
+        assert api.get_forecast(lat=48.85, lon=2.35) is None
+
+    assert get.call_count == 1
+    sleep.assert_not_called()
+
+
+def test_retry_recovers_after_5xx_and_429(api, sleep, make_response):
+    responses = [
+        make_response(503),
+        make_response(429, headers={"Retry-After": "0"}),
+        make_response(200, b'{"name": "Paris"}')
+    ]
+    with mock.patch.object(api._session, "get", side_effect=responses) as get:
+        assert api.get_current_weather(lat=48.85, lon=2.35) == {"name": "Paris"}
+
+    assert get.call_count == 3
+    # One jittered backoff after the 503, then the server-requested wait after the 429
+    assert sleep.call_count == 2
+    assert sleep.call_args_list[1] == mock.call(0.0)
+
+
+def test_retry_after_replaces_backoff(api, sleep, make_response):
+    responses = [make_response(429, headers={"Retry-After": "7"}), make_response(200)]
+    with mock.patch.object(api._session, "get", side_effect=responses):
+        assert api.get_forecast(lat=48.85, lon=2.35) == {}
+
+    sleep.assert_called_once_with(7.0)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("5", 5.0),
+    ("3600", WeatherAPI.RETRY_AFTER_MAX),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ("soon", None),
+    (None, None)
+])
+def test_parse_retry_after(value, expected):
+    assert WeatherAPI._parse_retry_after(value) == expected
+
+
+def warnings(caplog):
+    return [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+
+
+def test_retry_gives_up_with_one_warning(api, sleep, make_response, caplog):
+    with mock.patch.object(api._session, "get", return_value=make_response(500)) as get:
+        with caplog.at_level("WARNING", logger=weather_api.__name__):
+            assert api.get_current_weather(lat=48.85, lon=2.35) is None
+
+    assert get.call_count == WeatherAPI.MAX_RETRIES + 1
+    assert warnings(caplog) == [
+        f"Request to {WeatherAPI.WEATHER_URL} failed after {WeatherAPI.MAX_RETRIES + 1} attempts "
+        f"(0 rate limited): HTTP 500"
+    ]
+
+
+def test_rate_limited_failure_is_counted_in_the_warning(api, sleep, make_response, caplog):
+    responses = [make_response(429)] * WeatherAPI.MAX_RETRIES + [make_response(503)]
+    with mock.patch.object(api._session, "get", side_effect=responses):
+        with caplog.at_level("WARNING", logger=weather_api.__name__):
+            assert api.get_forecast(lat=48.85, lon=2.35) is None
+
+    assert warnings(caplog) == [
+        f"Request to {WeatherAPI.FORECAST_URL} failed after {WeatherAPI.MAX_RETRIES + 1} attempts "
+        f"({WeatherAPI.MAX_RETRIES} rate limited): HTTP 503"
+    ]
+
+
+def test_client_error_logs_one_warning(api, sleep, make_response, caplog):
+    with mock.patch.object(api._session, "get", return_value=make_response(401)):
+        with caplog.at_level("WARNING", logger=weather_api.__name__):
+            assert api.get_forecast(lat=48.85, lon=2.35) is None
+
+    assert warnings(caplog) == [f"Request to {WeatherAPI.FORECAST_URL} failed: HTTP 401"]
@@ -0,0 +1,96 @@
+"""
+Tests for WeatherAPI caching and request coalescing behavior
+"""
+
+import sys
+import threading
+import time
+from unittest import mock
+
+from src import weather_api
+from src.weather_api import WeatherAPI
+
+
+def test_concurrent_geocoding_is_coalesced(api, make_response):
+    def slow_get(*args, **kwargs):
+        time.sleep(0.2)
+        return make_response(200, b'[{"lat": 48.85, "lon": 2.35, "name": "Paris"}]')
+
+    results = []
+    with mock.patch.object(api._session, "get", side_effect=slow_get) as get:
+        threads = [threading.Thread(target=lambda: results.append(api._get_coordinates("Paris")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert get.call_count == 1
+    assert results == [{"lat": 48.85, "lon": 2.35, "name_en": "Paris"}] * 5
+    assert api._inflight == {}
+
+
+def test_results_are_copies_of_cached_data(api, make_response):
+    response = make_response(200, b'{"main": {"temp": 20.0}}')
+    with mock.patch.object(api._session, "get", return_value=response) as get:
+        api.get_current_weather(lat=48.85, lon=2.35)['main']['temp'] = -99
+        assert api.get_current_weather(lat=48.85, lon=2.35) == {"main": {"temp": 20.0}}
+
+    assert get.call_count == 1
+
+
+def test_cache_put_is_thread_safe(api):
+    cache = {}
+    errors = []
+
+    def fill(offset):
+        try:
+            for i in range(5000):
+                api._cache_put(cache, (offset, i), {}, 8)
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads as often as possible to expose races between eviction and insertion
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=fill, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(previous)
+
+    assert errors == []
+    assert len(cache) == 8
+
+
+def test_disk_geocode_cache_is_shared_between_clients(tmp_path):
+    path = tmp_path / "geocode"
+    first = WeatherAPI("test-key", geo_cache_path=path)
+    second = WeatherAPI("other-key", geo_cache_path=path)
+
+    first._disk_geo_put("paris", {"lat": 48.85, "lon": 2.35, "name_en": "Paris"})
+    second._disk_geo_put("rome", {"lat": 41.9, "lon": 12.5, "name_en": "Rome"})
+    first._disk_geo_put("oslo", {"lat": 59.9, "lon": 10.75, "name_en": "Oslo"})
+    first.close()
+    second.close()
+
+    reader = WeatherAPI("test-key", geo_cache_path=path)
+    with mock.patch.object(reader._session, "get") as get:
+        assert [reader._get_coordinates(city)["name_en"] for city in ("Paris", "Rome", "Oslo")] == \
+            ["Paris", "Rome", "Oslo"]
+    get.assert_not_called()
+    reader.close()
+
+
+def test_disk_geocode_entries_expire(tmp_path):
+    client = WeatherAPI("test-key", geo_cache_path=tmp_path / "geocode")
+    client._disk_geo_put("paris", {"lat": 48.85, "lon": 2.35, "name_en": "Paris"})
+
+    expired = time.time() + WeatherAPI.GEO_DISK_CACHE_TTL + 1
+    with mock.patch.object(weather_api.time, "time", return_value=expired):
+        assert client._disk_geo_get("paris") is None
+    assert client._disk_geo_get("paris") == {"lat": 48.85, "lon": 2.35, "name_en": "Paris"}
+    client.close()